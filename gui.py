@@ -265,7 +265,13 @@ class OptimaConfigurator(tk.Tk):
                         )
                     else:
                         self._display_output(f"  - {r.filepath} | {r.func_name} | Complexity: {r.complexity}")
-            
+
+            # --- display files skipped by the size/time/memory guards ---
+            if analysis_result.skipped_files:
+                self._display_output(f"Skipped {len(analysis_result.skipped_files)} file(s):")
+                for skipped in analysis_result.skipped_files:
+                    self._display_output(f"  - {skipped.filepath} | {skipped.reason}")
+
             self._display_output("-" * 20)
             self._display_output("Analysis complete.")
         except Exception as e:
@@ -1,8 +1,14 @@
 import argparse
+import multiprocessing
 import os
 import pathlib
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
 
 import lizard
 import requests
@@ -20,10 +26,34 @@ class FunctionComplexity:
     line_end: int
 
 
+@dataclass
+class SkippedFile:
+    filepath: str
+    reason: str
+
+
 @dataclass
 class AnalyseComplexityResult:
     max_complexity: int
     problematic_functions: list[FunctionComplexity]
+    skipped_files: list[SkippedFile] = field(default_factory=list)
+
+
+@dataclass
+class ScanLimits:
+    """Per-file guards for pathological inputs. A value of 0 disables the corresponding limit.
+
+    max_file_size and max_line_length are measured in bytes, not characters.
+    """
+
+    timeout: float = 60
+    max_memory_mb: int = 1024
+    max_file_size: int = 5 * 1024 * 1024
+    max_line_length: int = 10000
+
+
+class FileSkippedError(Exception):
+    pass
 
 
 def function_name_matches_any_regex(func_name: str, regex_list: list[re.Pattern]) -> bool:
@@ -33,38 +63,190 @@ def function_name_matches_any_regex(func_name: str, regex_list: list[re.Pattern]
     return False
 
 
-def analyze_file(filepath: str, max_complexity: int, regex_patterns: list[str]) -> AnalyseComplexityResult:
-    lizard_result = lizard.analyze_file(filepath)
+def check_file_limits(filepath: str, limits: ScanLimits) -> str | None:
+    """Return the reason a file must be skipped before parsing, or None if it is within limits."""
+    file_size = os.path.getsize(filepath)
+    if limits.max_file_size and file_size > limits.max_file_size:
+        return f"file size {file_size} bytes exceeds limit of {limits.max_file_size} bytes"
+
+    if limits.max_line_length:
+        with open(filepath, "rb") as f:
+            line_number = 1
+            # read at most one byte past the limit (plus CRLF) so a single minified line is never loaded whole
+            line = f.readline(limits.max_line_length + 2)
+            while line:
+                if len(line.rstrip(b"\r\n")) > limits.max_line_length:
+                    return f"line {line_number} exceeds max line length of {limits.max_line_length} bytes"
+                line_number += 1
+                line = f.readline(limits.max_line_length + 2)
+
+    return None
+
+
+def _apply_memory_limit(max_memory_mb: int):
+    """Lower the soft address-space limit of the current process, never exceeding an inherited hard limit."""
+    if resource is None or not max_memory_mb:
+        return
+    try:
+        soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+        limit = max_memory_mb * 1024 * 1024
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ValueError, OSError):
+        pass  # run without the ceiling rather than losing the worker
+
+
+def _lizard_worker_main(conn, max_memory_mb: int):
+    _apply_memory_limit(max_memory_mb)
+
+    while True:
+        filepath = conn.recv()
+        if filepath is None:
+            break
+        try:
+            lizard_result = lizard.analyze_file(filepath)
+            functions = [
+                (function.name, function.cyclomatic_complexity, function.start_line, function.end_line)
+                for function in lizard_result.function_list
+            ]
+            conn.send(("ok", functions))
+        except MemoryError:
+            conn.send(("memory", f"exceeded memory limit of {max_memory_mb} MB"))
+        except Exception as e:
+            conn.send(("error", f"parsing failed: {e}"))
+    conn.close()
+
+
+class LizardWorker:
+    """Runs lizard in a supervised child process that is killed and recycled when a file exceeds its limits."""
+
+    def __init__(self, limits: ScanLimits):
+        self.limits = limits
+        self._process = None
+        self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _start(self):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_lizard_worker_main, args=(child_conn, self.limits.max_memory_mb), daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+
+    def _kill(self):
+        if self._process is not None:
+            self._process.kill()
+            self._process.join()
+            self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def analyze(self, filepath: str) -> list[tuple[str, int, int, int]]:
+        """Return (name, complexity, line_begin, line_end) for every function, or raise FileSkippedError."""
+        if self._process is None or not self._process.is_alive():
+            self._kill()
+            self._start()
+
+        try:
+            self._conn.send(filepath)
+            if not self._conn.poll(self.limits.timeout or None):
+                self._kill()
+                raise FileSkippedError(f"timed out after {self.limits.timeout} seconds")
+            status, payload = self._conn.recv()
+        except (EOFError, OSError):
+            self._raise_worker_died()
+
+        if status == "memory":
+            # the interpreter is in an unreliable state after a MemoryError, start from a fresh one
+            self._kill()
+            raise FileSkippedError(payload)
+        if status == "error":
+            raise FileSkippedError(payload)
+        return payload
+
+    def _raise_worker_died(self):
+        # reap the dead child first, exitcode stays None until it has been joined
+        self._process.join(5)
+        exitcode = self._process.exitcode
+        self._kill()
+        if exitcode is not None and exitcode < 0:
+            raise FileSkippedError(f"worker process was killed by signal {-exitcode}")
+        raise FileSkippedError(f"worker process died (exit code {exitcode})")
+
+    def close(self):
+        if self._process is not None and self._process.is_alive():
+            try:
+                self._conn.send(None)
+                self._process.join(1)
+            except OSError:
+                pass  # the worker died in the meantime, _kill() below cleans up
+        self._kill()
+
+
+def analyze_file(
+    filepath: str,
+    max_complexity: int,
+    regex_patterns: list[str],
+    limits: ScanLimits | None = None,
+    worker: LizardWorker | None = None,
+) -> AnalyseComplexityResult:
+    limits = limits or ScanLimits()
     analyze_result = AnalyseComplexityResult(max_complexity, [])
 
+    try:
+        try:
+            skip_reason = check_file_limits(filepath, limits)
+        except OSError as e:
+            raise FileSkippedError(f"cannot read file: {e}")
+        if skip_reason is not None:
+            raise FileSkippedError(skip_reason)
+        if worker is None:
+            with LizardWorker(limits) as file_worker:
+                functions = file_worker.analyze(filepath)
+        else:
+            functions = worker.analyze(filepath)
+    except FileSkippedError as e:
+        analyze_result.skipped_files.append(SkippedFile(filepath, str(e)))
+        return analyze_result
+
     function_regexes = []
     for regex in regex_patterns:
         function_regexes.append(re.compile(regex))
 
-    for function in lizard_result.function_list:
-        if function.cyclomatic_complexity > max_complexity and function_name_matches_any_regex(
-            function.name, function_regexes
-        ):
-            func_comp = FunctionComplexity(
-                function.name, filepath, function.cyclomatic_complexity, function.start_line, function.end_line
-            )
+    for name, complexity, line_begin, line_end in functions:
+        if complexity > max_complexity and function_name_matches_any_regex(name, function_regexes):
+            func_comp = FunctionComplexity(name, filepath, complexity, line_begin, line_end)
             analyze_result.problematic_functions.append(func_comp)
 
     return analyze_result
 
 
 def analyze_directory(
-    directory: str, max_complexity: int, regex_patterns: list[str], extensions: list[str]
+    directory: str,
+    max_complexity: int,
+    regex_patterns: list[str],
+    extensions: list[str],
+    limits: ScanLimits | None = None,
 ) -> AnalyseComplexityResult:
+    limits = limits or ScanLimits()
     analyze_result = AnalyseComplexityResult(max_complexity, [])
 
-    for subdir, dirs, files in os.walk(directory):
-        for file in files:
-            filepath = subdir + os.sep + file
-            if len(extensions) == 0 or pathlib.Path(filepath).suffix in extensions:
-                analyze_result.problematic_functions.extend(
-                    analyze_file(filepath, max_complexity, regex_patterns).problematic_functions
-                )
+    with LizardWorker(limits) as worker:
+        for subdir, dirs, files in os.walk(directory):
+            for file in files:
+                filepath = subdir + os.sep + file
+                if len(extensions) == 0 or pathlib.Path(filepath).suffix in extensions:
+                    file_result = analyze_file(filepath, max_complexity, regex_patterns, limits, worker)
+                    analyze_result.problematic_functions.extend(file_result.problematic_functions)
+                    analyze_result.skipped_files.extend(file_result.skipped_files)
 
     return analyze_result
 
@@ -131,6 +313,20 @@ def getResponseFromAzureAI(file_data):
 
 
 
+def non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be a non-negative integer, got {value}")
+    return number
+
+
+def non_negative_float(value: str) -> float:
+    number = float(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be a non-negative number, got {value}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(
         prog="Optima", description="Function complexity calculator with llm-based optimisation"
@@ -146,14 +342,40 @@ def main():
     parser.add_argument(
         "-i", "--include-lines", action="store_true", help="Include lines in which function begins/ends"
     )
+    defaults = ScanLimits()
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        type=non_negative_float,
+        default=defaults.timeout,
+        help="Per-file parsing timeout in seconds (0 disables, default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=non_negative_int,
+        default=defaults.max_memory_mb,
+        help="Per-file parser memory ceiling in MB (0 disables, default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-file-size",
+        type=non_negative_int,
+        default=defaults.max_file_size,
+        help="Skip files larger than this many bytes (0 disables, default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-line-length",
+        type=non_negative_int,
+        default=defaults.max_line_length,
+        help="Skip files with a line longer than this many bytes (0 disables, default: %(default)s)",
+    )
     args = parser.parse_args()
 
+    limits = ScanLimits(args.timeout, args.max_memory, args.max_file_size, args.max_line_length)
     if args.file:
-        result = analyze_file(args.file, args.max_complexity, args.regex).problematic_functions
+        analyze_result = analyze_file(args.file, args.max_complexity, args.regex, limits)
     else:
-        result = analyze_directory(
-            args.directory, args.max_complexity, args.regex, args.extensions
-        ).problematic_functions
+        analyze_result = analyze_directory(args.directory, args.max_complexity, args.regex, args.extensions, limits)
+    result = analyze_result.problematic_functions
 
     if args.include_lines:
         for r in result:
@@ -162,6 +384,11 @@ def main():
         for r in result:
             print(f"{r.filepath} {r.func_name} {r.complexity}")
 
+    if analyze_result.skipped_files:
+        print(f"\nSkipped {len(analyze_result.skipped_files)} file(s):")
+        for skipped in analyze_result.skipped_files:
+            print(f"{skipped.filepath} {skipped.reason}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,216 @@
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+import pytest
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from main import FileSkippedError, LizardWorker, ScanLimits, check_file_limits  # noqa: E402
+
+# the worker inherits monkeypatched lizard functions only when the child is forked
+requires_fork = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork", reason="needs the fork start method"
+)
+
+COMPLEX_FUNCTION = "def f(x):\n" + "".join(f"    if x == {i}:\n        return {i}\n" for i in range(12))
+
+
+def write(tmp_path, name, content: bytes) -> str:
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def _sleep_forever(filepath):
+    time.sleep(60)
+
+
+def _exit_with_code_3(filepath):
+    os._exit(3)
+
+
+def _kill_self(filepath):
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+def _analyze_under_hard_limit(path, hard_limit, max_memory_mb, queue):
+    # runs in a separate process so lowering the hard limit does not leak into the test session
+    resource.setrlimit(resource.RLIMIT_AS, (hard_limit, hard_limit))
+    with LizardWorker(ScanLimits(max_memory_mb=max_memory_mb)) as worker:
+        try:
+            queue.put(worker.analyze(path))
+        except FileSkippedError as e:
+            queue.put(str(e))
+
+
+# --- check_file_limits ---
+
+
+def test_line_at_exact_limit_is_accepted(tmp_path):
+    path = write(tmp_path, "a.py", b"x" * 10 + b"\n")
+    assert check_file_limits(path, ScanLimits(max_line_length=10)) is None
+
+
+def test_line_one_byte_over_limit_is_rejected(tmp_path):
+    path = write(tmp_path, "a.py", b"ok\n" + b"x" * 11 + b"\n")
+    reason = check_file_limits(path, ScanLimits(max_line_length=10))
+    assert reason == "line 2 exceeds max line length of 10 bytes"
+
+
+def test_crlf_is_not_counted_towards_line_length(tmp_path):
+    path = write(tmp_path, "a.py", (b"x" * 10 + b"\r\n") * 3)
+    assert check_file_limits(path, ScanLimits(max_line_length=10)) is None
+
+
+def test_crlf_line_over_limit_is_rejected(tmp_path):
+    path = write(tmp_path, "a.py", b"x" * 11 + b"\r\n")
+    assert check_file_limits(path, ScanLimits(max_line_length=10)) is not None
+
+
+def test_last_line_without_newline_over_limit_is_rejected(tmp_path):
+    path = write(tmp_path, "a.py", b"x" * 10 + b"\n" + b"y" * 11)
+    reason = check_file_limits(path, ScanLimits(max_line_length=10))
+    assert reason == "line 2 exceeds max line length of 10 bytes"
+
+
+def test_line_length_is_measured_in_bytes(tmp_path):
+    path = write(tmp_path, "a.py", "中".encode() * 4 + b"\n")
+    assert check_file_limits(path, ScanLimits(max_line_length=11)) is not None
+    assert check_file_limits(path, ScanLimits(max_line_length=12)) is None
+
+
+def test_file_size_at_exact_limit_is_accepted(tmp_path):
+    path = write(tmp_path, "a.py", b"x=1\n" * 5)
+    assert check_file_limits(path, ScanLimits(max_file_size=20)) is None
+    assert check_file_limits(path, ScanLimits(max_file_size=19)) == "file size 20 bytes exceeds limit of 19 bytes"
+
+
+def test_zero_disables_limits(tmp_path):
+    path = write(tmp_path, "a.js", b"x" * 100000)
+    assert check_file_limits(path, ScanLimits(max_file_size=0, max_line_length=0)) is None
+
+
+# --- LizardWorker ---
+
+
+def test_worker_analyzes_file(tmp_path):
+    path = write(tmp_path, "a.py", COMPLEX_FUNCTION.encode())
+    with LizardWorker(ScanLimits()) as worker:
+        assert worker.analyze(path) == [("f", 13, 1, 25)]
+
+
+@requires_fork
+def test_worker_is_recycled_after_timeout(tmp_path, monkeypatch):
+    path = write(tmp_path, "a.py", COMPLEX_FUNCTION.encode())
+    with LizardWorker(ScanLimits(timeout=0.5)) as worker:
+        monkeypatch.setattr(main.lizard, "analyze_file", _sleep_forever)
+        with pytest.raises(FileSkippedError, match="timed out after 0.5 seconds"):
+            worker.analyze(path)
+        monkeypatch.undo()
+
+        assert worker.analyze(path) == [("f", 13, 1, 25)]
+
+
+@requires_fork
+def test_crashed_worker_reports_exit_code_and_is_restarted(tmp_path, monkeypatch):
+    path = write(tmp_path, "a.py", COMPLEX_FUNCTION.encode())
+    with LizardWorker(ScanLimits()) as worker:
+        monkeypatch.setattr(main.lizard, "analyze_file", _exit_with_code_3)
+        with pytest.raises(FileSkippedError, match=r"worker process died \(exit code 3\)"):
+            worker.analyze(path)
+        monkeypatch.undo()
+
+        assert worker.analyze(path) == [("f", 13, 1, 25)]
+
+
+@requires_fork
+def test_killed_worker_reports_signal(tmp_path, monkeypatch):
+    path = write(tmp_path, "a.py", COMPLEX_FUNCTION.encode())
+    monkeypatch.setattr(main.lizard, "analyze_file", _kill_self)
+    with LizardWorker(ScanLimits()) as worker:
+        with pytest.raises(FileSkippedError, match=f"killed by signal {int(signal.SIGKILL)}"):
+            worker.analyze(path)
+
+
+@pytest.mark.skipif(resource is None, reason="needs the resource module")
+def test_memory_limit_respects_lower_inherited_hard_limit(tmp_path):
+    path = write(tmp_path, "a.py", COMPLEX_FUNCTION.encode())
+    hard_limit = 2048 * 1024 * 1024
+    queue = multiprocessing.Queue()
+    # ask for a ceiling above the inherited hard limit, which setrlimit refuses to raise
+    process = multiprocessing.Process(target=_analyze_under_hard_limit, args=(path, hard_limit, 4096, queue))
+    process.start()
+    result = queue.get(timeout=30)
+    process.join()
+
+    assert result == [("f", 13, 1, 25)]
+
+
+def test_send_to_dead_worker_reports_exit_status(tmp_path, monkeypatch):
+    path = write(tmp_path, "a.py", COMPLEX_FUNCTION.encode())
+    with LizardWorker(ScanLimits()) as worker:
+        worker.analyze(path)
+        process = worker._process
+        process.kill()
+        process.join()
+        # simulate the child dying after the liveness check, so the send hits a closed pipe
+        monkeypatch.setattr(process, "is_alive", lambda: True)
+        with pytest.raises(FileSkippedError, match=f"killed by signal {int(signal.SIGKILL)}"):
+            worker.analyze(path)
+        monkeypatch.undo()
+
+        assert worker.analyze(path) == [("f", 13, 1, 25)]
+
+
+def test_close_tolerates_worker_dying_before_shutdown(tmp_path, monkeypatch):
+    path = write(tmp_path, "a.py", COMPLEX_FUNCTION.encode())
+    worker = LizardWorker(ScanLimits())
+    worker.analyze(path)
+    process = worker._process
+    process.kill()
+    process.join()
+    # simulate the child dying between the is_alive() check and the shutdown send
+    monkeypatch.setattr(process, "is_alive", lambda: True)
+    worker.close()
+    assert worker._process is None
+
+
+# --- analyze_directory / CLI ---
+
+
+def test_analyze_directory_reports_skipped_files(tmp_path):
+    write(tmp_path, "ok.py", COMPLEX_FUNCTION.encode())
+    minified = write(tmp_path, "min.js", b"var a=1;" * 2000)
+    result = main.analyze_directory(str(tmp_path), 10, [r".*"], [], ScanLimits(max_line_length=1000))
+
+    assert [f.func_name for f in result.problematic_functions] == ["f"]
+    assert [(s.filepath, s.reason) for s in result.skipped_files] == [
+        (minified, "line 1 exceeds max line length of 1000 bytes")
+    ]
+
+
+def test_unreadable_file_is_reported_as_skipped(tmp_path):
+    missing = str(tmp_path / "missing.py")
+    result = main.analyze_file(missing, 10, [r".*"])
+
+    assert result.problematic_functions == []
+    assert len(result.skipped_files) == 1
+    assert result.skipped_files[0].reason.startswith("cannot read file: [Errno 2]")
+
+
+@pytest.mark.parametrize("flag", ["--timeout", "--max-memory", "--max-file-size", "--max-line-length"])
+def test_cli_rejects_negative_limits(flag, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["main.py", "-f", "a.py", flag, "-1"])
+    with pytest.raises(SystemExit) as exc_info:
+        main.main()
+    assert exc_info.value.code == 2
+    assert "non-negative" in capsys.readouterr().err